@@ -2,60 +2,142 @@
 
 from __future__ import annotations
 
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
 import logging
+import re
+from time import time
 from typing import cast
 
 from aiobotocore.client import AioBaseClient as S3Client
+from aiobotocore.config import AioConfig
 from aiobotocore.session import AioSession
 from botocore.exceptions import ClientError, ConnectionError, ParamValidationError
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryError, ConfigEntryNotReady
+from homeassistant.helpers.importlib import async_import_module
 
 from .const import (
+    AWS_DOMAIN,
     CONF_ACCESS_KEY_ID,
     CONF_BUCKET,
     CONF_ENDPOINT_URL,
     CONF_PATH,
     CONF_SECRET_ACCESS_KEY,
+    CONF_VALIDATED_AT,
+    DATA_AIO_SESSION,
     DATA_BACKUP_AGENT_LISTENERS,
+    DATA_LOADED_ENTRIES,
     DEFAULT_PATH,
     DOMAIN,
+    VALIDATION_INTERVAL,
 )
 
-type S3FolderConfigEntry = ConfigEntry[S3Client]
+
+@dataclass(slots=True)
+class S3FolderData:
+    """Runtime data of a loaded S3 Folder config entry.
+
+    The bucket and base path are resolved once at setup so service calls
+    and the backup agent do not look them up in the entry data every time.
+    """
+
+    client: S3Client
+    bucket: str
+    base_path: str
+    key_prefix: str = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Precompute the normalized base path used to build object keys."""
+        self.key_prefix = join_path_elements(self.base_path)
+
+    def full_key(self, key: str) -> str:
+        """Return the S3 key for a key relative to the base path.
+
+        Equivalent to join_path_elements(base_path, key) for a single key,
+        without re-normalizing the base path on every call.
+        """
+        return self.key_prefix + key.strip("/")
+
+
+type S3FolderConfigEntry = ConfigEntry[S3FolderData]
 
 _LOGGER = logging.getLogger(__name__)
 
+_HOST_RE = re.compile(r"^https?://([^/:?#]+)", re.IGNORECASE)
+
+# Bound the time spent on unreachable endpoints or bad credentials, and size
+# the connection pool so concurrent service calls and backups sharing the
+# entry's long-lived client reuse open connections instead of reconnecting
+CLIENT_CONFIG = AioConfig(
+    retries={"mode": "adaptive", "max_attempts": 3},
+    connect_timeout=3,
+    read_timeout=10,
+    max_pool_connections=50,
+    tcp_keepalive=True,
+)
+
+
+@callback
+def async_get_session(hass: HomeAssistant) -> AioSession:
+    """Return the AioSession shared by all entries and config flows.
+
+    Creating a session loads the botocore data files, so it is done once
+    and reused instead of on every setup or validation.
+    """
+    if (session := hass.data.get(DATA_AIO_SESSION)) is None:
+        session = hass.data[DATA_AIO_SESSION] = AioSession()
+    return session
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: S3FolderConfigEntry) -> bool:
     """Set up S3 Folder from a config entry."""
 
     data = cast(dict, entry.data)
+    # Skip the network probe when the connection was validated recently,
+    # either by the config flow or by a previous setup
+    validated_at = data.get(CONF_VALIDATED_AT)
+    needs_validation = (
+        validated_at is None or time() - validated_at > VALIDATION_INTERVAL
+    )
     try:
-        session = AioSession()
-        client = await session.create_client(
-            "s3",
-            endpoint_url=data.get(CONF_ENDPOINT_URL),
-            aws_secret_access_key=data[CONF_SECRET_ACCESS_KEY],
-            aws_access_key_id=data[CONF_ACCESS_KEY_ID],
-        ).__aenter__()
-
-        # Process prefix path
-        path = data.get(CONF_PATH, DEFAULT_PATH) or ""
-        if path and not path.endswith("/"):
-            path += "/"
-
-        _LOGGER.debug("Validating list_objects_v2: bucket=%s, prefix=%s",
-                      data[CONF_BUCKET], path)
-
-        # Validate prefix permissions using list_objects_v2
-        await client.list_objects_v2(
-            Bucket=data[CONF_BUCKET],
-            Prefix=path,
-            MaxKeys=1,
-        )
+        session = async_get_session(hass)
+        # The exit stack closes the client if validation below fails
+        async with AsyncExitStack() as stack:
+            client = await stack.enter_async_context(
+                session.create_client(
+                    "s3",
+                    endpoint_url=data.get(CONF_ENDPOINT_URL),
+                    aws_secret_access_key=data[CONF_SECRET_ACCESS_KEY],
+                    aws_access_key_id=data[CONF_ACCESS_KEY_ID],
+                    region_name=region_from_hostname(
+                        endpoint_hostname(data.get(CONF_ENDPOINT_URL))
+                    ),
+                    config=CLIENT_CONFIG,
+                )
+            )
+
+            # Process prefix path
+            path = data.get(CONF_PATH, DEFAULT_PATH) or ""
+            if path and not path.endswith("/"):
+                path += "/"
+
+            if needs_validation:
+                _LOGGER.debug("Validating list_objects_v2: bucket=%s, prefix=%s",
+                              data[CONF_BUCKET], path)
+
+                # Validate credentials, bucket and prefix permissions in a single
+                # list_objects_v2 call; a separate head_bucket would be redundant
+                await client.list_objects_v2(
+                    Bucket=data[CONF_BUCKET],
+                    Prefix=path,
+                    MaxKeys=1,
+                )
+
+            # Validation passed, keep the client open until the entry unloads
+            client_stack = stack.pop_all()
 
     except ClientError as err:
         _LOGGER.error("S3 credential error or unable to access specified prefix: %s", err)
@@ -85,15 +167,39 @@ async def async_setup_entry(hass: HomeAssistant, entry: S3FolderConfigEntry) ->
         ) from err
 
     # Store client to entry
-    entry.runtime_data = client
+    entry.runtime_data = S3FolderData(
+        client=client,
+        bucket=data[CONF_BUCKET],
+        base_path=data.get(CONF_PATH, DEFAULT_PATH),
+    )
+    entry.async_on_unload(client_stack.aclose)
+
+    # Make the entry available to service calls until it is unloaded
+    loaded_entries = hass.data.setdefault(DATA_LOADED_ENTRIES, {})
+    loaded_entries[entry.entry_id] = entry
+
+    @callback
+    def remove_loaded_entry() -> None:
+        loaded_entries.pop(entry.entry_id, None)
+
+    entry.async_on_unload(remove_loaded_entry)
+
+    if needs_validation:
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_VALIDATED_AT: time()}
+        )
+
+    # Register services once; the module is imported in the executor so the
+    # first setup does not block the event loop on disk I/O
+    services = await async_import_module(hass, f"{__package__}.services")
+    if not hass.services.has_service(DOMAIN, services.SERVICE_GET_FILE):
+        await services.async_setup_services(hass)
 
-    # Register services
-    from . import services
-    await services.async_setup_services(hass)
+    # Backup agent listeners; the list is shared with the backup platform
+    listeners = hass.data.setdefault(DATA_BACKUP_AGENT_LISTENERS, [])
 
-    # Backup agent listeners
     def notify_backup_listeners() -> None:
-        for listener in hass.data.get(DATA_BACKUP_AGENT_LISTENERS, []):
+        for listener in listeners:
             listener()
 
     entry.async_on_unload(entry.async_on_state_change(notify_backup_listeners))
@@ -103,24 +209,51 @@ async def async_setup_entry(hass: HomeAssistant, entry: S3FolderConfigEntry) ->
 
 async def async_unload_entry(hass: HomeAssistant, entry: S3FolderConfigEntry) -> bool:
     """Unload a config entry."""
-    client = entry.runtime_data
-    await client.__aexit__(None, None, None)
+    # The client is closed by the exit stack registered with async_on_unload
     return True
 
 
+def endpoint_hostname(endpoint_url: str | None) -> str | None:
+    """Return the lower-cased hostname of an http(s) endpoint URL."""
+    match = _HOST_RE.match(endpoint_url) if endpoint_url else None
+    return match.group(1).lower() if match else None
+
+
+def region_from_hostname(hostname: str | None) -> str | None:
+    """Return the AWS region encoded in an S3 endpoint hostname.
+
+    Handles s3.<region>.amazonaws.com and the dualstack and FIPS variants.
+    Returns None for global or unrecognised endpoints so botocore resolves
+    the region itself.
+    """
+    if not hostname or not hostname.endswith(AWS_DOMAIN):
+        return None
+
+    labels = hostname.removesuffix(AWS_DOMAIN).rstrip(".").split(".")
+    for index, label in enumerate(labels):
+        if label in ("s3", "s3-fips"):
+            labels = labels[index + 1 :]
+            break
+    else:
+        return None
+    if labels[:1] == ["dualstack"]:
+        labels = labels[1:]
+    return labels[0] if len(labels) == 1 else None
+
+
 def join_path_elements(base_path: str, *paths: str) -> str:
     """Join path elements for S3 keys.
 
     Ensures consistent joining with trailing slashes for base,
     and no leading slashes for components.
     """
-    if not base_path:
-        base = ""
-    else:
-        base = base_path if base_path.endswith("/") else f"{base_path}/"
-
     if not paths:
-        return base
+        if base_path and not base_path.endswith("/"):
+            return f"{base_path}/"
+        return base_path
 
-    path_parts = [p.strip("/") for p in paths if p]
-    return f"{base}{'/'.join(path_parts)}"
+    tail = "/".join(p.strip("/") for p in paths if p)
+    if not base_path:
+        return tail
+    sep = "" if base_path.endswith("/") else "/"
+    return f"{base_path}{sep}{tail}"
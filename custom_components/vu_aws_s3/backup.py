@@ -19,7 +19,7 @@ from homeassistant.components.backup import (
 from homeassistant.core import HomeAssistant, callback
 
 from . import S3FolderConfigEntry, join_path_elements
-from .const import CONF_BUCKET, CONF_PATH, DATA_BACKUP_AGENT_LISTENERS, DEFAULT_PATH, DOMAIN
+from .const import DATA_BACKUP_AGENT_LISTENERS, DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 CACHE_TTL = 300
@@ -72,9 +72,9 @@ def async_register_backup_agents_listener(
     @callback
     def remove_listener() -> None:
         """Remove the listener."""
+        # Keep the (possibly empty) list in place; config entries hold a
+        # reference to it for notifications
         hass.data[DATA_BACKUP_AGENT_LISTENERS].remove(listener)
-        if not hass.data[DATA_BACKUP_AGENT_LISTENERS]:
-            del hass.data[DATA_BACKUP_AGENT_LISTENERS]
 
     return remove_listener
 
@@ -93,9 +93,9 @@ class S3FolderBackupAgent(BackupAgent):
     def __init__(self, hass: HomeAssistant, entry: S3FolderConfigEntry) -> None:
         """Initialize the S3 Folder agent."""
         super().__init__()
-        self._client = entry.runtime_data
-        self._bucket: str = entry.data[CONF_BUCKET]
-        self._base_path: str = entry.data.get(CONF_PATH, DEFAULT_PATH)
+        self._client = entry.runtime_data.client
+        self._bucket = entry.runtime_data.bucket
+        self._base_path = entry.runtime_data.base_path
         self.name = entry.title
         self.unique_id = entry.entry_id
         self._backup_cache: dict[str, AgentBackup] = {}
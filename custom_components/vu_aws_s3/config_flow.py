@@ -3,10 +3,9 @@
 from __future__ import annotations
 
 import logging
+from time import time
 from typing import Any
-from urllib.parse import urlparse
 
-from aiobotocore.session import AioSession
 from botocore.exceptions import ClientError, ConnectionError, ParamValidationError
 import voluptuous as vol
 
@@ -18,6 +17,12 @@ from homeassistant.helpers.selector import (
     TextSelectorType,
 )
 
+from . import (
+    CLIENT_CONFIG,
+    async_get_session,
+    endpoint_hostname,
+    region_from_hostname,
+)
 from .const import (
     AWS_DOMAIN,
     CONF_ACCESS_KEY_ID,
@@ -25,6 +30,7 @@ from .const import (
     CONF_ENDPOINT_URL,
     CONF_PATH,
     CONF_SECRET_ACCESS_KEY,
+    CONF_VALIDATED_AT,
     DEFAULT_ENDPOINT_URL,
     DEFAULT_PATH,
     DESCRIPTION_AWS_S3_DOCS_URL,
@@ -48,6 +54,11 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+_DESC_PLACEHOLDERS = {
+    "aws_s3_docs_url": DESCRIPTION_AWS_S3_DOCS_URL,
+    "boto3_docs_url": DESCRIPTION_BOTO3_DOCS_URL,
+}
+
 
 class S3FolderConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow."""
@@ -76,7 +87,7 @@ class S3FolderConfigFlow(ConfigFlow, domain=DOMAIN):
                     user_input[CONF_PATH] = path
 
                 endpoint_url = user_input[CONF_ENDPOINT_URL]
-                hostname = urlparse(endpoint_url).hostname
+                hostname = endpoint_hostname(endpoint_url)
 
                 if not hostname or not hostname.endswith(AWS_DOMAIN):
                     _LOGGER.error("Invalid endpoint URL: %s, hostname: %s", endpoint_url, hostname)
@@ -89,13 +100,14 @@ class S3FolderConfigFlow(ConfigFlow, domain=DOMAIN):
                         path,
                     )
                     try:
-                        session = AioSession()
+                        session = async_get_session(self.hass)
                         async with session.create_client(
                             "s3",
                             endpoint_url=endpoint_url,
                             aws_secret_access_key=user_input[CONF_SECRET_ACCESS_KEY],
                             aws_access_key_id=user_input[CONF_ACCESS_KEY_ID],
-                            region_name=endpoint_url.split(".")[1] if "." in endpoint_url else None,
+                            region_name=region_from_hostname(hostname),
+                            config=CLIENT_CONFIG,
                         ) as client:
                             result = await client.list_objects_v2(
                                 Bucket=user_input[CONF_BUCKET],
@@ -123,15 +135,15 @@ class S3FolderConfigFlow(ConfigFlow, domain=DOMAIN):
                         errors["base"] = "unknown_error"
                     else:
                         title = f"{user_input[CONF_BUCKET]}/{path}" if path else user_input[CONF_BUCKET]
-                        return self.async_create_entry(title=title, data=user_input)
+                        return self.async_create_entry(
+                            title=title,
+                            data={**user_input, CONF_VALIDATED_AT: time()},
+                        )
 
         return self.async_show_form(
             step_id="user",
             data_schema=self.add_suggested_values_to_schema(STEP_USER_DATA_SCHEMA, user_input),
             errors=errors,
-            description_placeholders={
-                "aws_s3_docs_url": DESCRIPTION_AWS_S3_DOCS_URL,
-                "boto3_docs_url": DESCRIPTION_BOTO3_DOCS_URL,
-            },
+            description_placeholders=_DESC_PLACEHOLDERS,
         )
 
@@ -3,6 +3,9 @@
 from collections.abc import Callable
 from typing import Final
 
+from aiobotocore.session import AioSession
+
+from homeassistant.config_entries import ConfigEntry
 from homeassistant.util.hass_dict import HassKey
 
 DOMAIN: Final = "vu_aws_s3"
@@ -12,14 +15,25 @@ CONF_SECRET_ACCESS_KEY = "secret_access_key"
 CONF_ENDPOINT_URL = "endpoint_url"
 CONF_BUCKET = "bucket"
 CONF_PATH = "path"  # 新增 path 欄位
+CONF_VALIDATED_AT = "validated_at"  # 上次成功驗證連線的時間戳
 
 AWS_DOMAIN = "amazonaws.com"
 DEFAULT_ENDPOINT_URL = f"https://s3.eu-central-1.{AWS_DOMAIN}/"
 DEFAULT_PATH = ""  # 預設路徑為空字串（根目錄）
 
+# 距離上次驗證超過此秒數時，重新啟動才會再次驗證連線
+VALIDATION_INTERVAL = 24 * 60 * 60
+
 DATA_BACKUP_AGENT_LISTENERS: HassKey[list[Callable[[], None]]] = HassKey(
     f"{DOMAIN}.backup_agent_listeners"
 )
 
+DATA_AIO_SESSION: HassKey[AioSession] = HassKey(f"{DOMAIN}.aio_session")
+
+# 已載入的設定項目，以 entry_id 為鍵，供服務呼叫快速查詢
+DATA_LOADED_ENTRIES: HassKey[dict[str, ConfigEntry]] = HassKey(
+    f"{DOMAIN}.loaded_entries"
+)
+
 DESCRIPTION_AWS_S3_DOCS_URL = "https://docs.aws.amazon.com/general/latest/gr/s3.html"
 DESCRIPTION_BOTO3_DOCS_URL = "https://boto3.amazonaws.com/v1/documentation/api/latest/reference/core/session.html"
\ No newline at end of file
@@ -3,10 +3,15 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Callable, Iterable
+import contextlib
+from datetime import datetime
+from functools import partial
+import logging
+from operator import itemgetter
 import os
 import tempfile
-from typing import Any, cast
+from typing import Any, BinaryIO, cast
 
 from botocore.exceptions import BotoCoreError, ClientError
 
@@ -14,42 +19,79 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, ServiceCall, callback
 from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
 import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
 import voluptuous as vol
 
-from . import S3FolderConfigEntry, join_path_elements
-from .const import CONF_BUCKET, CONF_PATH, DEFAULT_PATH, DOMAIN
+from . import S3FolderConfigEntry, S3FolderData
+from .const import DATA_LOADED_ENTRIES, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
 
 # 服務名稱
 SERVICE_GET_FILE = "get_file"
 SERVICE_PUT_FILE = "put_file"
 SERVICE_DELETE_FILE = "delete_file"
+SERVICE_DELETE_FILES = "delete_files"
 SERVICE_LIST_FILES = "list_files"
 
 # 服務參數
+ATTR_ENTRY_ID = "entry_id"
 ATTR_FILENAME = "filename"
 ATTR_PATH = "path"
 ATTR_KEY = "key"
+ATTR_KEYS = "keys"
 ATTR_PREFIX = "prefix"
 ATTR_LOCAL_FILE = "local_file"
 ATTR_CONTENT_TYPE = "content_type"
 ATTR_DELIMITER = "delimiter"
 ATTR_MAX_KEYS = "max_keys"
+ATTR_ATOMIC_WRITE = "atomic_write"
+ATTR_RECURSIVE = "recursive"
+ATTR_SINCE = "since"
+ATTR_RANGE_START = "range_start"
+ATTR_RANGE_END = "range_end"
 
 # 檔案內容類型預設值
 DEFAULT_CONTENT_TYPE = "application/octet-stream"
 DEFAULT_DELIMITER = "/"
 DEFAULT_MAX_KEYS = 1000
 
+# 超過此大小的檔案改用 multipart 上傳，每次只讀取一個 part 到記憶體
+# S3 每個 part 最小 5 MiB (最後一個除外)
+MULTIPART_THRESHOLD = 8 * 2**20
+MULTIPART_PART_SIZE = 8 * 2**20
+# S3 每個 multipart 上傳最多 10000 個 part，大檔案會放大 part 大小
+MULTIPART_MAX_PARTS = 10000
+# 同時上傳的 part 數量，也是同時保留在記憶體中的 part 數量上限
+MULTIPART_CONCURRENCY = 4
+
+# get_file 每次從回應串流讀取並寫入磁碟的大小，較大的 chunk 可減少
+# Python 層級的迴圈次數與 executor 工作數量
+DOWNLOAD_CHUNK_SIZE = 2**20
+
+# delete_objects 每次請求最多可刪除的 key 數量
+DELETE_OBJECTS_MAX_KEYS = 1000
+
+# 遞迴列出檔案時，同時查詢的子資料夾數量上限
+LIST_CONCURRENCY = 16
+# list_objects_v2 每頁最多回傳的 key 數量
+LIST_MAX_PAGE_SIZE = 1000
+
 # 服務定義
 SCHEMA_GET_FILE = vol.Schema(
     {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
         vol.Required(ATTR_KEY): cv.string,
         vol.Required(ATTR_LOCAL_FILE): cv.string,
+        vol.Optional(ATTR_ATOMIC_WRITE, default=True): cv.boolean,
+        vol.Optional(ATTR_RANGE_START): cv.positive_int,
+        vol.Optional(ATTR_RANGE_END): cv.positive_int,
     }
 )
 
 SCHEMA_PUT_FILE = vol.Schema(
     {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
         vol.Required(ATTR_KEY): cv.string,
         vol.Required(ATTR_LOCAL_FILE): cv.string,
         vol.Optional(ATTR_CONTENT_TYPE, default=DEFAULT_CONTENT_TYPE): cv.string,
@@ -58,117 +100,361 @@ SCHEMA_PUT_FILE = vol.Schema(
 
 SCHEMA_DELETE_FILE = vol.Schema(
     {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
         vol.Required(ATTR_KEY): cv.string,
     }
 )
 
+SCHEMA_DELETE_FILES = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Required(ATTR_KEYS): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
 SCHEMA_LIST_FILES = vol.Schema(
     {
-        vol.Optional(ATTR_PREFIX): cv.string,
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_PREFIX, default=""): cv.string,
         vol.Optional(ATTR_DELIMITER, default=DEFAULT_DELIMITER): cv.string,
         vol.Optional(ATTR_MAX_KEYS, default=DEFAULT_MAX_KEYS): cv.positive_int,
+        vol.Optional(ATTR_RECURSIVE, default=False): cv.boolean,
+        vol.Optional(ATTR_SINCE): cv.datetime,
     }
 )
 
 
+def _get_file_size(path: str) -> int | None:
+    """Return the size of a regular file, or None if it does not exist."""
+    if not os.path.isfile(path):
+        return None
+    return os.path.getsize(path)
+
+
+def _open_destination(
+    directory: str, path: str, atomic_write: bool
+) -> tuple[str, BinaryIO]:
+    """Open the file a download is written to and return its path and handle.
+
+    With atomic_write a temporary file is created next to the destination so
+    the final os.replace is a same-filesystem rename instead of a copy.
+    """
+    if atomic_write:
+        temp_file = tempfile.NamedTemporaryFile(
+            dir=directory, prefix=".partial-", delete=False
+        )
+        return temp_file.name, cast(BinaryIO, temp_file)
+    return path, open(path, "wb")
+
+
+def _safe_unlink(path: str) -> None:
+    """Remove a file, ignoring it if it does not exist."""
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+
+
+def _read_file(path: str, offset: int = 0, size: int = -1) -> bytes:
+    """Read a file, or a slice of it, from disk."""
+    with open(path, "rb") as file:
+        if offset:
+            file.seek(offset)
+        return file.read(size)
+
+
+async def _async_upload_multipart(
+    hass: HomeAssistant,
+    client: Any,
+    bucket: str,
+    key: str,
+    local_file: str,
+    file_size: int,
+    content_type: str,
+) -> None:
+    """Upload a large local file part by part.
+
+    Parts are uploaded concurrently, with at most MULTIPART_CONCURRENCY parts
+    held in memory at a time. Disk reads run in the executor, so the event
+    loop is never blocked on file I/O. Parts grow beyond MULTIPART_PART_SIZE
+    when needed to stay within MULTIPART_MAX_PARTS.
+    """
+    part_size = max(MULTIPART_PART_SIZE, -(-file_size // MULTIPART_MAX_PARTS))
+    multipart_upload = await client.create_multipart_upload(
+        Bucket=bucket,
+        Key=key,
+        ContentType=content_type,
+    )
+    upload_id = multipart_upload["UploadId"]
+    semaphore = asyncio.Semaphore(MULTIPART_CONCURRENCY)
+
+    async def upload_part(part_number: int, offset: int) -> dict[str, Any]:
+        async with semaphore:
+            data = await hass.async_add_executor_job(
+                _read_file, local_file, offset, part_size
+            )
+            part = await client.upload_part(
+                Bucket=bucket,
+                Key=key,
+                PartNumber=part_number,
+                UploadId=upload_id,
+                Body=data,
+            )
+        return {"PartNumber": part_number, "ETag": part["ETag"]}
+
+    try:
+        # TaskGroup 在第一個分段失敗時會取消其餘的上傳
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                tasks = [
+                    task_group.create_task(upload_part(part_number, offset))
+                    for part_number, offset in enumerate(
+                        range(0, file_size, part_size), start=1
+                    )
+                ]
+        except BaseExceptionGroup as err:
+            raise err.exceptions[0] from None
+        parts = [task.result() for task in tasks]
+
+        await client.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except BaseException:
+        # 任何失敗 (包含取消) 都放棄上傳，避免 S3 保留未完成的分段
+        try:
+            await client.abort_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+            )
+        except (BotoCoreError, ClientError):
+            _LOGGER.exception("Failed to abort multipart upload")
+        raise
+
+
+async def _async_paginate(
+    client: Any, **kwargs: Any
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Return all Contents and CommonPrefixes of a paginated listing."""
+    contents: list[dict[str, Any]] = []
+    common_prefixes: list[dict[str, Any]] = []
+    paginator = client.get_paginator("list_objects_v2")
+    async for page in paginator.paginate(**kwargs):
+        contents.extend(page.get("Contents", ()))
+        common_prefixes.extend(page.get("CommonPrefixes", ()))
+    return contents, common_prefixes
+
+
+async def _async_list_recursive(
+    client: Any,
+    bucket: str,
+    prefix: str,
+    max_keys: int,
+    page_size: int,
+    select: Callable[[Iterable[dict[str, Any]]], Iterable[dict[str, Any]]],
+) -> list[dict[str, Any]]:
+    """List the first max_keys selected objects under prefix, sorted by key.
+
+    The top level is listed with a delimiter to discover sub-prefixes, which
+    are then listed concurrently instead of in one long sequential scan.
+    S3 returns keys in order, so each sub-prefix listing stops once it holds
+    max_keys selected objects; the first max_keys overall are among them.
+    """
+    contents, sub_prefixes = await _async_paginate(
+        client, Bucket=bucket, Prefix=prefix, Delimiter="/"
+    )
+    contents = [*select(contents)][:max_keys]
+    semaphore = asyncio.Semaphore(LIST_CONCURRENCY)
+
+    async def list_sub_prefix(sub_prefix: str) -> list[dict[str, Any]]:
+        files: list[dict[str, Any]] = []
+        async with semaphore:
+            paginator = client.get_paginator("list_objects_v2")
+            async for page in paginator.paginate(
+                Bucket=bucket,
+                Prefix=sub_prefix,
+                PaginationConfig={"PageSize": page_size},
+            ):
+                files.extend(select(page.get("Contents", ())))
+                if len(files) >= max_keys:
+                    break
+        return files
+
+    # TaskGroup 在第一個子資料夾查詢失敗時會取消其餘的查詢
+    try:
+        async with asyncio.TaskGroup() as task_group:
+            tasks = [
+                task_group.create_task(list_sub_prefix(item["Prefix"]))
+                for item in sub_prefixes
+            ]
+    except BaseExceptionGroup as err:
+        raise err.exceptions[0] from None
+    for task in tasks:
+        contents.extend(task.result())
+
+    contents.sort(key=itemgetter("Key"))
+    return contents[:max_keys]
+
+
 async def async_setup_services(hass: HomeAssistant) -> None:
     """Set up services for AWS S3 Folder integration."""
 
+    # get_file 已建立或確認存在的目錄
+    ensured_dirs: set[str] = set()
+
+    # 與 async_setup_entry 共用同一個 dict，設定項載入或卸載時會即時更新
+    loaded_entries = hass.data.setdefault(DATA_LOADED_ENTRIES, {})
+
+    def resolve_local(path: str) -> str:
+        """Convert a path relative to the config directory to an absolute one."""
+        # 將用戶的相對路徑轉換為絕對路徑
+        return path if os.path.isabs(path) else hass.config.path(path)
+
     @callback
-    def get_client_for_call(call: ServiceCall) -> tuple[S3FolderConfigEntry, dict[str, Any]]:
-        """Get an S3 client instance for the service call."""
-        entries: list[S3FolderConfigEntry] = hass.config_entries.async_entries(DOMAIN)
-        if not entries:
-            raise ServiceValidationError(
-                f"No configured {DOMAIN} entries found",
-                translation_domain=DOMAIN,
-                translation_key="no_configured_entries",
-            )
+    def get_client_for_call(call: ServiceCall) -> S3FolderData:
+        """Get the S3 client, bucket and base path for the service call."""
+        entry_id = call.data.get(ATTR_ENTRY_ID)
 
-        entry_id = call.data.get("entry_id")
-        
-        if entry_id:
-            entry = next((entry for entry in entries if entry.entry_id == entry_id), None)
-            if not entry:
+        # 常見情況：未指定 entry_id 且只有一個已載入的設定項，直接使用它
+        if not entry_id and len(loaded_entries) == 1:
+            entry = next(iter(loaded_entries.values()))
+            return cast(S3FolderConfigEntry, entry).runtime_data
+
+        if not entry_id:
+            # 預設使用設定順序中的第一個設定項，不受載入 (或重新載入) 順序影響
+            entries = hass.config_entries.async_entries(DOMAIN)
+            if not entries:
+                raise ServiceValidationError(
+                    f"No configured {DOMAIN} entries found",
+                    translation_domain=DOMAIN,
+                    translation_key="no_configured_entries",
+                )
+            entry_id = entries[0].entry_id
+
+        entry = loaded_entries.get(entry_id)
+
+        if entry is None:
+            # 找不到已載入的設定項時，才查詢設定項以回報正確的錯誤
+            if hass.config_entries.async_get_entry(entry_id) is None:
                 raise ServiceValidationError(
                     f"No {DOMAIN} entry found with id {entry_id}",
                     translation_domain=DOMAIN,
                     translation_key="entry_not_found",
                 )
-        else:
-            entry = entries[0]  # 使用第一個設定項
-        
-        # 確保 entry 已載入
-        if not entry.state.recoverable:
             raise ServiceValidationError(
                 f"{DOMAIN} integration is not loaded",
                 translation_domain=DOMAIN,
                 translation_key="integration_not_loaded",
             )
-        
-        client = cast(S3FolderConfigEntry, entry).runtime_data
-        return entry, client
+
+        return cast(S3FolderConfigEntry, entry).runtime_data
+
+    async def open_destination(
+        target_dir: str, local_file: str, atomic_write: bool
+    ) -> tuple[str, BinaryIO]:
+        """Open the download destination, recreating a removed target_dir."""
+        # 建立臨時檔案，避免下載中斷造成的問題
+        # 目的地不支援原子性 rename (例如掛載的物件儲存) 時可直接寫入目標檔案
+        open_job = partial(_open_destination, target_dir, local_file, atomic_write)
+        try:
+            return await hass.async_add_executor_job(open_job)
+        except FileNotFoundError:
+            # 目錄在快取後被移除，重新建立後再試一次
+            ensured_dirs.discard(target_dir)
+            await hass.async_add_executor_job(
+                partial(os.makedirs, target_dir, exist_ok=True)
+            )
+            ensured_dirs.add(target_dir)
+            return await hass.async_add_executor_job(open_job)
 
     async def handle_get_file(call: ServiceCall) -> None:
         """Handle the get_file service call."""
-        entry, client = get_client_for_call(call)
+        runtime = get_client_for_call(call)
+        client, bucket = runtime.client, runtime.bucket
         
         key = call.data[ATTR_KEY]
-        local_file = call.data[ATTR_LOCAL_FILE]
-        
-        # 將用戶的相對路徑轉換為絕對路徑
-        if not os.path.isabs(local_file):
-            local_file = hass.config.path(local_file)
+        local_file = resolve_local(call.data[ATTR_LOCAL_FILE])
+        atomic_write = call.data[ATTR_ATOMIC_WRITE]
+        range_start = call.data.get(ATTR_RANGE_START)
+        range_end = call.data.get(ATTR_RANGE_END)
+
+        # 只下載指定的位元組範圍 (包含 range_end)
+        get_kwargs: dict[str, Any] = {}
+        if range_start is not None or range_end is not None:
+            if range_start is None:
+                range_start = 0
+            if range_end is not None and range_end < range_start:
+                raise ServiceValidationError(
+                    f"Invalid byte range {range_start}-{range_end}",
+                    translation_domain=DOMAIN,
+                    translation_key="invalid_range",
+                )
+            end = "" if range_end is None else range_end
+            get_kwargs["Range"] = f"bytes={range_start}-{end}"
         
-        # 確保目標目錄存在
-        os.makedirs(os.path.dirname(local_file), exist_ok=True)
+        # 確保目標目錄存在 (已確認過的目錄不再重複檢查)
+        target_dir = os.path.dirname(local_file)
+        if target_dir not in ensured_dirs:
+            await hass.async_add_executor_job(
+                partial(os.makedirs, target_dir, exist_ok=True)
+            )
+            ensured_dirs.add(target_dir)
         
         # 將 key 與設定的路徑結合
-        base_path = entry.data.get(CONF_PATH, DEFAULT_PATH)
-        full_key = join_path_elements(base_path, key)
+        full_key = runtime.full_key(key)
         
+        temp_path: str | None = None
+        completed = False
         try:
-            # 建立臨時檔案，避免下載中斷造成的問題
-            with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                temp_path = temp_file.name
-            
             response = await client.get_object(
-                Bucket=entry.data[CONF_BUCKET], 
-                Key=full_key
+                Bucket=bucket, 
+                Key=full_key,
+                **get_kwargs,
             )
-            
-            # 從響應中讀取內容並寫入臨時檔案
+
+            # 從響應中讀取內容並寫入臨時檔案，磁碟寫入在 executor 中進行
             async with response["Body"] as stream:
-                with open(temp_path, "wb") as temp_file:
-                    async for chunk in stream.iter_chunks():
-                        temp_file.write(chunk)
-            
+                # 取得物件後才決定寫入位置，查詢失敗時不會動到既有的目標檔案
+                temp_path, temp_file = await open_destination(
+                    target_dir, local_file, atomic_write
+                )
+                try:
+                    async for chunk in stream.iter_chunks(DOWNLOAD_CHUNK_SIZE):
+                        await hass.async_add_executor_job(temp_file.write, chunk)
+                finally:
+                    await hass.async_add_executor_job(temp_file.close)
+
             # 移動臨時檔案到目標位置
-            os.replace(temp_path, local_file)
-        
+            if atomic_write:
+                await hass.async_add_executor_job(os.replace, temp_path, local_file)
+            completed = True
+
         except (BotoCoreError, ClientError) as err:
-            # 清理臨時檔案
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
-                
             raise HomeAssistantError(
                 f"Error downloading file from S3: {err}"
             ) from err
+        except OSError as err:
+            raise HomeAssistantError(
+                f"Error writing downloaded file {local_file}: {err}"
+            ) from err
+        finally:
+            # 任何失敗 (包含取消) 都清理臨時檔案 (或未完成的目標檔案)
+            if not completed and temp_path:
+                await hass.async_add_executor_job(_safe_unlink, temp_path)
 
     async def handle_put_file(call: ServiceCall) -> None:
         """Handle the put_file service call."""
-        entry, client = get_client_for_call(call)
+        runtime = get_client_for_call(call)
+        client, bucket = runtime.client, runtime.bucket
         
         key = call.data[ATTR_KEY]
-        local_file = call.data[ATTR_LOCAL_FILE]
-        content_type = call.data.get(ATTR_CONTENT_TYPE, DEFAULT_CONTENT_TYPE)
+        local_file = resolve_local(call.data[ATTR_LOCAL_FILE])
+        content_type = call.data[ATTR_CONTENT_TYPE]
         
-        # 將用戶的相對路徑轉換為絕對路徑
-        if not os.path.isabs(local_file):
-            local_file = hass.config.path(local_file)
-        
-        # 檢查檔案是否存在
-        if not os.path.isfile(local_file):
+        # 檢查檔案是否存在 (在 executor 中執行，避免阻塞事件迴圈)
+        file_size = await hass.async_add_executor_job(_get_file_size, local_file)
+        if file_size is None:
             raise ServiceValidationError(
                 f"File {local_file} does not exist",
                 translation_domain=DOMAIN,
@@ -176,104 +462,148 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             )
         
         # 將 key 與設定的路徑結合
-        base_path = entry.data.get(CONF_PATH, DEFAULT_PATH)
-        full_key = join_path_elements(base_path, key)
+        full_key = runtime.full_key(key)
         
         try:
-            # 讀取檔案內容
-            with open(local_file, "rb") as file:
-                file_data = file.read()
-            
-            # 上傳到 S3
-            await client.put_object(
-                Bucket=entry.data[CONF_BUCKET],
-                Key=full_key,
-                Body=file_data,
-                ContentType=content_type,
-            )
+            if file_size > MULTIPART_THRESHOLD:
+                # 大檔案分段上傳，不一次讀入整個檔案
+                await _async_upload_multipart(
+                    hass,
+                    client,
+                    bucket,
+                    full_key,
+                    local_file,
+                    file_size,
+                    content_type,
+                )
+            else:
+                # 讀取檔案內容
+                file_data = await hass.async_add_executor_job(_read_file, local_file)
+
+                # 上傳到 S3
+                await client.put_object(
+                    Bucket=bucket,
+                    Key=full_key,
+                    Body=file_data,
+                    ContentType=content_type,
+                )
         
         except (BotoCoreError, ClientError) as err:
             raise HomeAssistantError(
                 f"Error uploading file to S3: {err}"
             ) from err
 
-    async def handle_delete_file(call: ServiceCall) -> None:
-        """Handle the delete_file service call."""
-        entry, client = get_client_for_call(call)
-        
-        key = call.data[ATTR_KEY]
-        
+    async def delete_keys(runtime: S3FolderData, keys: list[str]) -> None:
+        """Delete keys relative to the entry's path, up to 1000 per request."""
+        client, bucket = runtime.client, runtime.bucket
+
         # 將 key 與設定的路徑結合
-        base_path = entry.data.get(CONF_PATH, DEFAULT_PATH)
-        full_key = join_path_elements(base_path, key)
-        
+        full_keys = [runtime.full_key(key) for key in keys]
+
         try:
-            await client.delete_object(
-                Bucket=entry.data[CONF_BUCKET],
-                Key=full_key,
-            )
-        
+            for start in range(0, len(full_keys), DELETE_OBJECTS_MAX_KEYS):
+                response = await client.delete_objects(
+                    Bucket=bucket,
+                    Delete={
+                        "Objects": [
+                            {"Key": key}
+                            for key in full_keys[start : start + DELETE_OBJECTS_MAX_KEYS]
+                        ],
+                        "Quiet": True,
+                    },
+                )
+                # Quiet 模式下只會回傳刪除失敗的 key
+                if errors := response.get("Errors"):
+                    failed = ", ".join(f"{e['Key']} ({e['Code']})" for e in errors)
+                    raise HomeAssistantError(
+                        f"Error deleting files from S3: {failed}"
+                    )
+
         except (BotoCoreError, ClientError) as err:
             raise HomeAssistantError(
                 f"Error deleting file from S3: {err}"
             ) from err
 
+    async def handle_delete_file(call: ServiceCall) -> None:
+        """Handle the delete_file service call."""
+        await delete_keys(get_client_for_call(call), [call.data[ATTR_KEY]])
+
+    async def handle_delete_files(call: ServiceCall) -> None:
+        """Handle the delete_files service call."""
+        await delete_keys(get_client_for_call(call), call.data[ATTR_KEYS])
+
     async def handle_list_files(call: ServiceCall) -> dict[str, Any]:
         """Handle the list_files service call."""
-        entry, client = get_client_for_call(call)
+        runtime = get_client_for_call(call)
+        client, bucket, base_path = runtime.client, runtime.bucket, runtime.base_path
         
         # 獲取參數
-        base_path = entry.data.get(CONF_PATH, DEFAULT_PATH)
-        prefix = call.data.get(ATTR_PREFIX, "")
-        delimiter = call.data.get(ATTR_DELIMITER, DEFAULT_DELIMITER)
-        max_keys = call.data.get(ATTR_MAX_KEYS, DEFAULT_MAX_KEYS)
+        prefix = call.data[ATTR_PREFIX]
+        delimiter = call.data[ATTR_DELIMITER]
+        max_keys = call.data[ATTR_MAX_KEYS]
+        recursive = call.data[ATTR_RECURSIVE]
+        since = call.data.get(ATTR_SINCE)
+        if since is not None:
+            since = dt_util.as_utc(since)
+
+        def select(items: Iterable[dict[str, Any]]) -> Iterable[dict[str, Any]]:
+            """Filter out files last modified before since, if given."""
+            if since is None:
+                return items
+            return (item for item in items if item["LastModified"] >= since)
         
         # 將 prefix 與設定的路徑結合
-        full_prefix = join_path_elements(base_path, prefix)
+        full_prefix = runtime.full_key(prefix)
+
+        # 有 since 過濾時每頁可能只有少數符合，改用最大頁面以減少請求次數
+        page_size = max_keys if since is None else LIST_MAX_PAGE_SIZE
         
         try:
-            response = await client.list_objects_v2(
-                Bucket=entry.data[CONF_BUCKET],
-                Prefix=full_prefix,
-                Delimiter=delimiter,
-                MaxKeys=max_keys,
-            )
+            if recursive:
+                # 遞迴列出所有檔案 (平面清單)，子資料夾會並行查詢
+                contents = await _async_list_recursive(
+                    client, bucket, full_prefix, max_keys, page_size, select
+                )
+                common_prefixes = []
+            else:
+                kwargs: dict[str, Any] = {
+                    "Bucket": bucket,
+                    "Prefix": full_prefix,
+                    "PaginationConfig": {"PageSize": page_size},
+                }
+                # 空的 delimiter 代表不分組，S3 直接回傳平面清單
+                if delimiter:
+                    kwargs["Delimiter"] = delimiter
+
+                # 逐頁讀取並在讀取時過濾，符合條件的檔案達到 max_keys 時提前停止
+                contents = []
+                common_prefixes = []
+                paginator = client.get_paginator("list_objects_v2")
+                async for page in paginator.paginate(**kwargs):
+                    contents.extend(select(page.get("Contents", ())))
+                    common_prefixes.extend(page.get("CommonPrefixes", ()))
+                    if len(contents) >= max_keys:
+                        break
             
             # 提取檔案和資料夾資訊
-            result = {
-                "files": [],
-                "prefixes": [],
+            # S3 回傳的 key 必定以 full_prefix (即 base_path) 開頭，
+            # 直接切掉基本路徑前綴以顯示相對路徑
+            bp_len = len(base_path) if base_path else 0
+            # 綁定為區域變數，省去每個項目的屬性查詢；保留字串格式以維持回傳結構不變
+            isoformat = datetime.isoformat
+            return {
+                # 處理檔案
+                "files": [
+                    {
+                        "key": item["Key"][bp_len:],
+                        "size": item["Size"],
+                        "last_modified": isoformat(item["LastModified"]),
+                    }
+                    for item in contents[:max_keys]
+                ],
+                # 處理資料夾（通用前綴）
+                "prefixes": [item["Prefix"][bp_len:] for item in common_prefixes],
             }
-            
-            # 處理檔案
-            for item in response.get("Contents", []):
-                key = item["Key"]
-                
-                # 移除基本路徑前綴以顯示相對路徑
-                if base_path and key.startswith(base_path):
-                    rel_key = key[len(base_path):]
-                else:
-                    rel_key = key
-                
-                result["files"].append({
-                    "key": rel_key,
-                    "size": item["Size"],
-                    "last_modified": item["LastModified"].isoformat(),
-                })
-            
-            # 處理資料夾（通用前綴）
-            for prefix in response.get("CommonPrefixes", []):
-                prefix_key = prefix["Prefix"]
-                
-                # 移除基本路徑前綴以顯示相對路徑
-                if base_path and prefix_key.startswith(base_path):
-                    rel_prefix = prefix_key[len(base_path):]
-                else:
-                    rel_prefix = prefix_key
-                
-                result["prefixes"].append(rel_prefix)
-            
-            return result
         
         except (BotoCoreError, ClientError) as err:
             raise HomeAssistantError(
@@ -290,6 +620,9 @@ async def async_setup_services(hass: HomeAssistant) -> None:
     hass.services.async_register(
         DOMAIN, SERVICE_DELETE_FILE, handle_delete_file, schema=SCHEMA_DELETE_FILE
     )
+    hass.services.async_register(
+        DOMAIN, SERVICE_DELETE_FILES, handle_delete_files, schema=SCHEMA_DELETE_FILES
+    )
     hass.services.async_register(
         DOMAIN, SERVICE_LIST_FILES, handle_list_files, schema=SCHEMA_LIST_FILES
     )
\ No newline at end of file